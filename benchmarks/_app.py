@@ -0,0 +1,49 @@
+"""在无 Streamlit 运行时的情况下导入 vote2supabase，并提供各基准脚本共用的随机投票数据"""
+import os
+import random
+import sys
+
+from streamlit import logger
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 裸模式下 Streamlit 会对每次 session_state 访问打印警告
+logger.set_log_level("error")
+
+import vote2supabase as app  # noqa: E402,F401
+
+
+def make_ballots(n_voters, n_slogans, min_votes=1, max_votes=20, submitted_ratio=1.0, seed=0):
+    """随机生成 n_voters 位投票人（评委0、评委1……）的选择，逐个产出 (voter_id, slogan_ids, voted)
+
+    每人选 min_votes 到 max_votes 条互不相同的口号，与 votes 表 (voter_id, slogan_id) 的唯一键一致。
+    """
+    rng = random.Random(seed)
+    for i in range(n_voters):
+        voted = rng.random() < submitted_ratio
+        yield f"评委{i}", rng.sample(range(1, n_slogans + 1), rng.randint(min_votes, max_votes)), voted
+
+
+def make_votes_data(n_voters, n_slogans, max_votes=20, submitted_ratio=0.8, seed=0):
+    """投票人汇总字典 {voter_id: {"votes": [...], "voted": bool}}，允许有人一条都未选"""
+    return {
+        voter_id: {"votes": slogan_ids, "voted": voted}
+        for voter_id, slogan_ids, voted in make_ballots(n_voters, n_slogans, 0, max_votes, submitted_ratio, seed)
+    }
+
+
+def seed_slogans(client, n_slogans):
+    """在数据后端上预置序号 1..n_slogans 的口号目录"""
+    client.table('slogans').insert([
+        {'serial_number': i, 'slogan_text': f"南岳衡山口号{i}"} for i in range(1, n_slogans + 1)
+    ]).execute()
+
+
+def seed_votes(client, n_voters, n_slogans, min_votes=1, max_votes=20, submitted_ratio=1.0, seed=0):
+    """在数据后端上预置 n_voters 位投票人的选择，见 make_ballots"""
+    client.table('votes').insert([
+        {'voter_id': voter_id, 'slogan_id': slogan_id, 'voted': voted}
+        for voter_id, slogan_ids, voted in make_ballots(n_voters, n_slogans, min_votes, max_votes,
+                                                         submitted_ratio, seed)
+        for slogan_id in slogan_ids
+    ]).execute()
@@ -0,0 +1,58 @@
+"""导出原始投票记录的耗时、文件大小和峰值内存
+
+对比一次性构建整张DataFrame再生成 CSV 字符串的做法，与分页读取、逐批写入各导出格式的做法。
+耗时不开启跟踪单独测量；峰值内存再运行一次由 tracemalloc 统计（pyarrow 自身的内存分配不计入）。
+
+用法: python benchmarks/bench_export.py [--rows 100000] [--chunk-size 5000]
+"""
+import argparse
+import time
+import tracemalloc
+
+from _app import app, seed_votes
+from memory_supabase import MemorySupabase
+
+
+def whole_table_csv(client):
+    """原有做法：读出全部记录，构建整张DataFrame，再生成完整的 CSV 字符串"""
+    records = list(app.iter_votes('id, voter_id, slogan_id, created_at', voted=True, client=client))
+    df = app.build_votes_dataframe(records)
+    return df.to_csv(index=False, date_format="%Y-%m-%d %H:%M:%S").encode('utf-8-sig')
+
+
+def measure(fn):
+    start = time.perf_counter()
+    data = fn()
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed_ms, len(data), peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--chunk-size", type=int, default=app.EXPORT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    client = MemorySupabase()
+    # 每位评委 20 票，共 --rows 条记录
+    seed_votes(client, args.rows // 20, 500, min_votes=20, max_votes=20)
+
+    cases = [("整表 CSV", lambda: whole_table_csv(client))]
+    for export_format in app.EXPORT_FORMATS:
+        cases.append((f"分批 {export_format}", lambda export_format=export_format: app.export_chunks(
+            app.iter_vote_export_chunks(client, args.chunk_size), app.VOTES_DF_COLUMNS, export_format)))
+
+    print(f"{args.rows} 条已提交投票，每批 {args.chunk_size} 行")
+    print(f"{'方式':<12}{'耗时(ms)':>12}{'文件(MB)':>12}{'峰值内存(MB)':>14}")
+    for name, fn in cases:
+        elapsed_ms, size, peak = measure(fn)
+        print(f"{name:<12}{elapsed_ms:>12.1f}{size / 2 ** 20:>12.1f}{peak / 2 ** 20:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
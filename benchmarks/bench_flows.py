@@ -0,0 +1,102 @@
+"""投票各流程在不同规模下的耗时与往返次数
+
+在 memory_supabase 内存数据库上（可注入每次请求的延迟）依次执行：
+新会话登录（新投票人 / 已有记录的投票人）、连续勾选 N 次、最终提交、管理员加载和刷新，
+记录每个流程的墙钟时间和发往数据库的请求次数。
+
+用法: python benchmarks/bench_flows.py [--scales 100 1000 10000] [--latency-ms 20] [--toggles 20]
+"""
+import argparse
+import time
+
+import streamlit as st
+
+from _app import app, seed_slogans, seed_votes
+from memory_supabase import MemorySupabase
+
+
+def new_session(client, voter_id=""):
+    """模拟一个新的浏览器会话"""
+    st.session_state.supabase = client
+    st.session_state.slogan_df = None
+    st.session_state.data_loaded = False
+    st.session_state.voter_id = voter_id
+    st.session_state.voted = False
+    st.session_state.voter_record = None
+
+
+def login(voter_id):
+    new_session(st.session_state.supabase, voter_id)
+    app.initialize_data()
+    return app.check_voter_status()
+
+
+def toggles(voter_id, n_slogans, count):
+    """连续勾选 count 次，由后台写入队列合并后写入"""
+    queue = app.WriteBehindQueue(metrics=app.get_supabase_metrics())
+    selection = set()
+    for slogan_id in range(1, count + 1):
+        selection.add(slogan_id % n_slogans + 1)
+        app.get_vote_cache().apply_selection(voter_id, selection)
+        queue.submit(st.session_state.supabase, voter_id, selection)
+    return queue.flush(voter_id)
+
+
+def submit(voter_id):
+    return app.get_write_queue().flush(voter_id) and app.save_voter_status_to_supabase(voter_id, True)
+
+
+def admin_load():
+    app.initialize_data()
+    app.refresh_votes_cache()
+    tally, summary = app.load_vote_tally()
+    app.get_vote_cache().vote_matrix()
+    return tally, summary
+
+
+def measure(name, fn):
+    metrics = app.get_supabase_metrics()
+    start = time.perf_counter()
+    with metrics.action(name) as action:
+        fn()
+    return (time.perf_counter() - start) * 1000, action['round_trips']
+
+
+def run_scale(n_voters, n_slogans, latency_ms, toggle_count):
+    client = MemorySupabase(latency=latency_ms / 1000)
+    seed_slogans(client, n_slogans)
+    seed_votes(client, n_voters, n_slogans, submitted_ratio=0.8)
+    client.request_count = 0
+    instrumented = app.InstrumentedClient(client, app.get_supabase_metrics())
+    app.get_vote_cache.clear()
+    new_session(instrumented)
+
+    voter_id = f"新评委{n_voters}"
+    flows = [
+        ("登录（新投票人）", lambda: login(voter_id)),
+        ("登录（已有记录）", lambda: login("评委0")),
+        (f"勾选 {toggle_count} 次", lambda: toggles(voter_id, n_slogans, toggle_count)),
+        ("最终提交", lambda: submit(voter_id)),
+        ("管理员加载", admin_load),
+        ("刷新", lambda: app.refresh_votes_cache(force=True)),
+    ]
+    return [(name, *measure(name, fn)) for name, fn in flows]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scales", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--slogans", type=int, default=500)
+    parser.add_argument("--latency-ms", type=float, default=20)
+    parser.add_argument("--toggles", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{args.slogans} 条口号，每次请求注入 {args.latency_ms:g}ms 延迟")
+    print(f"{'投票人数':>8}  {'流程':<14}{'耗时(ms)':>12}{'往返次数':>10}")
+    for n_voters in args.scales:
+        for name, elapsed_ms, round_trips in run_scale(n_voters, args.slogans, args.latency_ms, args.toggles):
+            print(f"{n_voters:>10}  {name:<14}{elapsed_ms:>12.1f}{round_trips:>12}")
+
+
+if __name__ == "__main__":
+    main()
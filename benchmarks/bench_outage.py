@@ -0,0 +1,135 @@
+"""数据库故障期间后台写入队列的表现
+
+内存替身在 [--outage-start, --outage-start + --outage] 秒内对所有请求抛出连接错误，
+期间评委们持续勾选（经后台写入队列），另有 --sessions 个会话不断同步读取投票人记录。
+对比有无熔断器时：故障期间打到数据库的请求数（重试风暴）、同步请求的 p99 延迟、
+恢复后多久把积压的更改全部重放完毕，以及最终数据库中的选择是否与评委的最新选择一致。
+
+用法: python benchmarks/bench_outage.py [--voters 200] [--sessions 50] [--outage 5] [--latency-ms 5]
+"""
+import argparse
+import math
+import random
+import statistics
+import threading
+import time
+
+from _app import app
+from memory_supabase import MemorySupabase
+
+
+class FlakyQuery:
+    """故障期间 execute() 抛出 ConnectionError 的查询构造器"""
+
+    def __init__(self, query, backend):
+        self._query = query
+        self._backend = backend
+
+    def __getattr__(self, name):
+        attr = getattr(self._query, name)
+        if not callable(attr):
+            return attr
+        return lambda *args, **kwargs: FlakyQuery(attr(*args, **kwargs), self._backend)
+
+    def execute(self):
+        return self._backend.execute(self._query)
+
+
+class FlakyBackend:
+    def __init__(self, client):
+        self.client = client
+        self.down = False
+        self.attempts_while_down = 0
+        self._lock = threading.Lock()
+
+    def table(self, table_name):
+        return FlakyQuery(self.client.table(table_name), self)
+
+    def rpc(self, fn, params=None):
+        return FlakyQuery(self.client.rpc(fn, params), self)
+
+    def execute(self, query):
+        if self.down:
+            with self._lock:
+                self.attempts_while_down += 1
+            time.sleep(self.client.latency)
+            raise ConnectionError("connection refused")
+        return query.execute()
+
+
+def run(args, breaker):
+    rng = random.Random(0)
+    backend = FlakyBackend(MemorySupabase(latency=args.latency_ms / 1000))
+    client = app.ResilientClient(backend, breaker)
+    queue = app.WriteBehindQueue(debounce=0.2, max_delay=1.0, retry_max_delay=args.retry_max_delay)
+    latest = {}
+    latencies = []
+    running = True
+
+    def session(i):
+        while running:
+            started = time.perf_counter()
+            try:
+                client.table('votes').select('slogan_id, voted').eq('voter_id', f"评委{i}").execute()
+            except Exception:
+                pass
+            latencies.append((time.perf_counter() - started) * 1000)
+            time.sleep(0.2)
+
+    sessions = [threading.Thread(target=session, args=(i,), daemon=True) for i in range(args.sessions)]
+    for thread in sessions:
+        thread.start()
+
+    start = time.monotonic()
+    end_of_outage = args.outage_start + args.outage
+    while time.monotonic() - start < end_of_outage + 1:
+        elapsed = time.monotonic() - start
+        backend.down = args.outage_start <= elapsed < end_of_outage
+        voter_id = f"评委{rng.randrange(args.voters)}"
+        selection = set(rng.sample(range(1, 201), rng.randint(1, 20)))
+        latest[voter_id] = selection
+        queue.submit(client, voter_id, selection)
+        time.sleep(0.002)
+    backend.down = False
+    running = False
+    for thread in sessions:
+        thread.join()
+
+    recovered = time.monotonic()
+    while any(queue.status(voter_id)['state'] != 'saved' for voter_id in latest):
+        time.sleep(0.05)
+        if time.monotonic() - recovered > 120:
+            break
+    replay_s = time.monotonic() - recovered + 1
+
+    stored = {}
+    for row in backend.client.table('votes').select('voter_id, slogan_id').execute().data:
+        stored.setdefault(row['voter_id'], set()).add(row['slogan_id'])
+    consistent = all(stored.get(voter_id, set()) == selection for voter_id, selection in latest.items())
+    p99 = statistics.quantiles(latencies, n=100)[98]
+    return backend.attempts_while_down, p99, replay_s, consistent
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--voters", type=int, default=200)
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--outage-start", type=float, default=1.0)
+    parser.add_argument("--outage", type=float, default=5.0)
+    parser.add_argument("--latency-ms", type=float, default=5)
+    parser.add_argument("--retry-max-delay", type=float, default=app.WRITE_BEHIND_RETRY_MAX_DELAY)
+    args = parser.parse_args()
+
+    cases = [
+        ("无熔断", app.CircuitBreaker(failure_threshold=math.inf)),
+        ("熔断", app.CircuitBreaker()),
+    ]
+    print(f"{args.voters} 名评委持续勾选，第 {args.outage_start:g} 秒起数据库故障 {args.outage:g} 秒")
+    print(f"{'方式':<8}{'故障期间请求数':>16}{'同步请求p99(ms)':>18}{'恢复后重放完毕(s)':>20}{'最终一致':>10}")
+    for name, breaker in cases:
+        attempts, p99, replay_s, consistent = run(args, breaker)
+        print(f"{name:<8}{attempts:>16}{p99:>18.0f}{replay_s:>20.1f}{'是' if consistent else '否':>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""排名稳定性：向量化自助法与逐次重抽样的 Python 循环的对比
+
+对 --voters 名投票人 × --slogans 个口号的随机投票，
+1. VoteMatrix.rank_stability 做 --boot 次重抽样（分批矩阵乘法 + 批量排序）；
+2. 逐次重抽样投票人、在投票人汇总字典上计票并排序，只跑 --loop-boot 次后按比例折算。
+两者用同一规则排名，给出每次重抽样的耗时和折算到 --boot 次的总耗时。
+
+用法: python benchmarks/bench_rank_stability.py [--voters 1000] [--slogans 5000] [--boot 2000]
+"""
+import argparse
+import random
+import time
+
+from _app import app, make_votes_data
+
+
+def loop_rank_stability(votes_data, n_boot, top_k, seed=0):
+    """原始做法：每次重抽样都遍历投票人字典计票并排序"""
+    rng = random.Random(seed)
+    ballots = [entry["votes"] for entry in votes_data.values() if entry.get("voted", False)]
+    ranks = {}
+    in_top_k = {}
+    for _ in range(n_boot):
+        counts = {}
+        for _ in range(len(ballots)):
+            for slogan_id in ballots[rng.randrange(len(ballots))]:
+                counts[slogan_id] = counts.get(slogan_id, 0) + 1
+        ranked = sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+        for rank, (slogan_id, _) in enumerate(ranked, 1):
+            ranks.setdefault(slogan_id, []).append(rank)
+            if rank <= top_k:
+                in_top_k[slogan_id] = in_top_k.get(slogan_id, 0) + 1
+    return ranks, in_top_k
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--voters", type=int, default=1000)
+    parser.add_argument("--slogans", type=int, default=5000)
+    parser.add_argument("--boot", type=int, default=app.RANK_BOOTSTRAP_SAMPLES)
+    parser.add_argument("--loop-boot", type=int, default=20)
+    parser.add_argument("--top-k", type=int, default=app.RANK_STABILITY_TOP_K)
+    args = parser.parse_args()
+
+    votes_data = make_votes_data(args.voters, args.slogans)
+    matrix = app.VoteMatrix.from_votes_data(votes_data, range(1, args.slogans + 1))
+    matrix.rank_stability(n_boot=10, seed=0)
+
+    start = time.perf_counter()
+    result = matrix.rank_stability(top_k=args.top_k, n_boot=args.boot, seed=0)
+    vector_ms = (time.perf_counter() - start) * 1000
+    assert result['slogan_id'].tolist() == [slogan_id for slogan_id, _ in matrix.tally()]
+
+    start = time.perf_counter()
+    loop_rank_stability(votes_data, args.loop_boot, args.top_k)
+    loop_ms = (time.perf_counter() - start) * 1000 / args.loop_boot * args.boot
+
+    summary = matrix.summary()
+    print(f"{summary['total_voters']} 名已提交的投票人 × {len(result)} 个得票口号，重抽样 {args.boot} 次")
+    print(f"{'方式':<16}{'每次(ms)':>12}{'总耗时(ms)':>14}")
+    print(f"{'向量化':<16}{vector_ms / args.boot:>12.3f}{vector_ms:>14.0f}")
+    print(f"{'Python 循环':<16}{loop_ms / args.boot:>12.3f}{loop_ms:>14.0f}  （{args.loop_boot} 次折算）")
+    print(f"加速比 {loop_ms / vector_ms:.0f}x")
+    print(result.head(args.top_k + 5).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
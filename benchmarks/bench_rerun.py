@@ -0,0 +1,104 @@
+"""测量投票页每次勾选时执行的脚本耗时：整页重跑与只重跑勾选列表 fragment 的对比
+
+用 AppTest 在内存数据库上运行 vote2supabase.py，用两种方式各切换 --toggles 次口号的勾选：
+1. 整页重跑：AppTest 默认的运行方式，等同于没有 fragment 时每次交互都从头执行脚本（含 main()）；
+2. 只重跑 fragment：与浏览器中点击 fragment 内的控件一样，请求重跑时带上勾选列表 fragment 的 ID，
+   脚本运行器只执行 display_slogan_grid，不执行 main() 和数据初始化。
+勾选处理中的 rerun_fragment 还会再触发一次运行，所以每次勾选两种方式都运行两次；两种方式交替进行。
+给出每次勾选的总耗时（AppTest 的 run() 调用，含两种方式相同的 AppTest 开销），
+以及应用通过 record_run_time 记录、在这次勾选的各次运行中累加的 main() 与 slogan_grid 的耗时；
+只重跑 fragment 时 main() 不会执行。
+
+用法: python benchmarks/bench_rerun.py [--slogans 2000] [--toggles 10]
+"""
+import argparse
+import functools
+import os
+import statistics
+import time
+from unittest import mock
+
+from streamlit import logger
+from streamlit.runtime.scriptrunner_utils.script_requests import RerunData
+from streamlit.testing.v1 import AppTest, local_script_runner
+
+from _app import seed_slogans  # 同时设置日志级别并把仓库根目录加入 sys.path
+from memory_supabase import MemorySupabase
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "vote2supabase.py")
+
+
+def fragment_id(at, function_name):
+    """从 AppTest 的 fragment 存储中找出由 function_name 注册的 fragment（读取 Streamlit 内部结构，仅用于基准）"""
+    for key, wrapped in at._fragment_storage._fragments.items():
+        if any(getattr(cell.cell_contents, '__name__', None) == function_name
+               for cell in wrapped.__closure__ or ()):
+            return key
+    raise LookupError(function_name)
+
+
+class RunTimes(dict):
+    """累加同一次交互中多次运行记录的耗时（record_run_time 每次运行覆盖写入）"""
+
+    def __setitem__(self, name, ms):
+        super().__setitem__(name, self.get(name, 0) + ms)
+
+
+def toggle(at, slogan_id, fragment=None):
+    """切换一条口号的勾选并运行，返回 (run() 耗时 ms, 这次勾选的各次运行累加的 run_times)"""
+    at.session_state['run_times'] = RunTimes()
+    checkbox = at.checkbox(key=f"cb_{slogan_id}_1")
+    checkbox.set_value(not checkbox.value)
+    rerun_data = RerunData if fragment is None else functools.partial(RerunData, fragment_id_queue=[fragment])
+    with mock.patch.object(local_script_runner, 'RerunData', rerun_data):
+        start = time.perf_counter()
+        checkbox.run()
+        elapsed = (time.perf_counter() - start) * 1000
+    assert not at.exception, [e.value for e in at.exception]
+    return elapsed, dict(at.session_state['run_times'])
+
+
+def report(label, runs):
+    totals = [total for total, _ in runs]
+    line = f"  {label:<16}{statistics.median(totals):10.2f}{max(totals):10.2f}"
+    for name in ('main', 'slogan_grid'):
+        times = [run_times[name] for _, run_times in runs if name in run_times]
+        line += f"{statistics.median(times):12.2f}" if times else f"{'未执行':>10}"
+    print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--slogans", type=int, default=2000)
+    parser.add_argument("--toggles", type=int, default=10)
+    args = parser.parse_args()
+    logger.set_log_level("error")
+
+    client = MemorySupabase()
+    seed_slogans(client, args.slogans)
+
+    at = AppTest.from_file(APP_PATH, default_timeout=60)
+    at.session_state['supabase'] = client
+    at.session_state['voter_id'] = "评委0"
+    at.run()
+
+    toggle(at, 1)
+    full, scoped = [], []
+    for i in range(args.toggles):
+        # 整页运行会重新登记 fragment，每次都取最新的 ID
+        scoped.append(toggle(at, 2 + i % 5, fragment_id(at, 'display_slogan_grid')))
+        full.append(toggle(at, 7 + i % 5))
+    assert 1 in at.session_state['voter_record']['votes']
+
+    print(f"{args.slogans} 条口号，每种方式切换勾选 {args.toggles} 次（单位 ms）")
+    print(f"  {'方式':<14}{'总中位数':>8}{'总最大值':>8}{'main()':>12}{'slogan_grid':>12}")
+    report("整页重跑", full)
+    report("只重跑 fragment", scoped)
+    full_ms = statistics.median(run_times['main'] for _, run_times in full)
+    scoped_ms = statistics.median(run_times['slogan_grid'] for _, run_times in scoped)
+    print(f"每次勾选的脚本执行耗时：整页 {full_ms:.2f} ms，只重跑 fragment {scoped_ms:.2f} ms，"
+          f"节省 {(1 - scoped_ms / full_ms) * 100:.0f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""共同得票矩阵：稀疏 XᵀX 与稠密矩阵乘法的对比
+
+对 --voters 名投票人、每人最多 20 票的随机投票，在不同口号数下比较
+1. CoVoteMatrix：按投票人展开口号对后合并（稀疏 XᵀX），以及由它取出前 20 对和聚类；
+2. 稠密做法：X 展开为 float32 矩阵后计算 XᵀX（口号数 × 口号数），口号数超过 --dense-max 时跳过。
+给出耗时和结果占用的内存。
+
+用法: python benchmarks/bench_similarity.py [--voters 1000] [--slogans 1000 5000 20000]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from _app import app, make_votes_data
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return (time.perf_counter() - start) * 1000, result
+
+
+def dense_co_votes(matrix):
+    dense = matrix.to_dense(submitted_only=True).astype(np.float32)
+    return dense.T @ dense
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--voters", type=int, default=1000)
+    parser.add_argument("--slogans", type=int, nargs="+", default=[1000, 5000, 20000])
+    parser.add_argument("--dense-max", type=int, default=10000)
+    args = parser.parse_args()
+
+    print(f"{args.voters} 名投票人，每人最多 20 票")
+    print(f"{'口号数':>8}{'非零口号对':>12}{'稀疏(ms)':>10}{'查询(ms)':>10}{'稀疏(MB)':>10}"
+          f"{'稠密(ms)':>10}{'稠密(MB)':>10}")
+    for n_slogans in args.slogans:
+        matrix = app.VoteMatrix.from_votes_data(make_votes_data(args.voters, n_slogans), range(1, n_slogans + 1))
+        sparse_ms, co_votes = timed(matrix.co_votes)
+        query_ms, _ = timed(lambda: (co_votes.top_pairs(), co_votes.clusters()))
+        sparse_mb = sum(array.nbytes for array in (co_votes.left, co_votes.right, co_votes.counts)) / 2 ** 20
+
+        dense_ms = dense_mb = float("nan")
+        if n_slogans <= args.dense_max:
+            dense_ms, dense = timed(lambda: dense_co_votes(matrix))
+            dense_mb = dense.nbytes / 2 ** 20
+            assert (dense[co_votes.left, co_votes.right] == co_votes.counts).all()
+            assert np.count_nonzero(np.triu(dense, 1)) == len(co_votes)
+        print(f"{n_slogans:>8}{len(co_votes):>12}{sparse_ms:>10.1f}{query_ms:>10.1f}{sparse_mb:>10.1f}"
+              f"{dense_ms:>10.0f}{dense_mb:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""投票人页面的冷启动耗时和导入时间分布
+
+每项测量都在新的 Python 进程中进行，相当于 Pod 重启后的第一次访问：
+1. `python -X importtime` 导入应用，按顶层包汇总各包自身的导入耗时；
+2. 用 AppTest 渲染一次投票人首页的总耗时（含解释器启动），以及此后已加载的可选依赖；
+3. 创建托管数据库客户端的耗时：直接创建 PostgREST 客户端，对比 supabase.create_client。
+--eager 在应用之前先导入 plotly.express、requests 和 supabase，模拟全部依赖在模块顶部导入的做法。
+
+用法: python benchmarks/bench_startup.py [--runs 5] [--backend memory]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(REPO, "vote2supabase.py")
+
+# 投票人页面不需要、只在管理员界面或回退路径上用到的依赖
+OPTIONAL_MODULES = ["plotly.express", "requests", "supabase", "postgrest", "realtime", "openpyxl", "pyarrow"]
+
+EAGER_IMPORTS = "import plotly.express, requests, supabase\n"
+
+IMPORT_PROBE = """
+import sys
+sys.path.insert(0, {repo!r})
+from streamlit import logger
+logger.set_log_level("error")
+{eager}import vote2supabase
+"""
+
+COLD_START_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+{eager}from streamlit.testing.v1 import AppTest
+at = AppTest.from_file({app!r}, default_timeout=120)
+at.run()
+assert not at.exception, at.exception
+print(json.dumps({{
+    "run_ms": (time.perf_counter() - start) * 1000,
+    "loaded": [name for name in {modules!r} if name in sys.modules]
+}}))
+"""
+
+CLIENT_PROBE = """
+import sys, time
+sys.path.insert(0, {repo!r})
+from streamlit import logger
+logger.set_log_level("error")
+import vote2supabase as app
+start = time.perf_counter()
+{create}
+print((time.perf_counter() - start) * 1000)
+"""
+
+
+def run_python(code, backend, *flags):
+    env = dict(os.environ, SUPABASE_BACKEND=backend)
+    return subprocess.run([sys.executable, *flags, "-c", code], env=env, cwd=REPO,
+                          capture_output=True, text=True, check=True)
+
+
+def import_breakdown(backend, eager):
+    """按顶层包汇总 -X importtime 中各模块自身的导入耗时（毫秒）"""
+    result = run_python(IMPORT_PROBE.format(repo=REPO, eager=EAGER_IMPORTS if eager else ""),
+                        backend, "-X", "importtime")
+    totals = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        package = name.strip().split(".")[0]
+        totals[package] = totals.get(package, 0) + int(self_us) / 1000
+    return totals
+
+
+def cold_start(backend, eager, runs):
+    wall, render, loaded = [], [], []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = run_python(COLD_START_PROBE.format(app=APP, modules=OPTIONAL_MODULES,
+                                                    eager=EAGER_IMPORTS if eager else ""), backend)
+        wall.append((time.perf_counter() - start) * 1000)
+        report = json.loads(result.stdout.strip().splitlines()[-1])
+        render.append(report["run_ms"])
+        loaded = report["loaded"]
+    return statistics.median(wall), statistics.median(render), loaded
+
+
+def client_creation(runs):
+    cases = {
+        "PostgREST 客户端": "app.create_supabase_client()",
+        "supabase.create_client": "import supabase; supabase.create_client(app.SUPABASE_URL, app.SUPABASE_KEY)",
+    }
+    return {name: statistics.median(
+        float(run_python(CLIENT_PROBE.format(repo=REPO, create=create), "memory").stdout.strip().splitlines()[-1])
+        for _ in range(runs)
+    ) for name, create in cases.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--backend", default="memory", help="SUPABASE_BACKEND，默认使用无需网络的内存替身")
+    parser.add_argument("--top", type=int, default=12)
+    parser.add_argument("--eager", action="store_true", help="先导入 plotly.express、requests、supabase")
+    args = parser.parse_args()
+
+    totals = import_breakdown(args.backend, args.eager)
+    print(f"导入应用的耗时分布（后端 {args.backend}，共 {sum(totals.values()):.0f}ms）")
+    print(f"{'包':<24}{'导入耗时(ms)':>14}")
+    for package, ms in sorted(totals.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"{package:<24}{ms:>14.1f}")
+
+    wall_ms, render_ms, loaded = cold_start(args.backend, args.eager, args.runs)
+    print(f"\n投票人首页冷启动（{args.runs} 次中位数）: 进程总耗时 {wall_ms:.0f}ms，其中导入并渲染 {render_ms:.0f}ms")
+    print(f"已加载的可选依赖: {', '.join(loaded) or '无'}")
+
+    print("\n创建托管数据库客户端（含导入）")
+    for name, ms in client_creation(args.runs).items():
+        print(f"{name:<24}{ms:>10.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
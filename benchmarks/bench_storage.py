@@ -0,0 +1,80 @@
+"""各数据后端上投票相关操作的单次延迟
+
+在同一批预置数据上，对比内存替身（可注入网络延迟，模拟托管数据库）与本地 SQLite 数据库文件，
+逐项测量投票人登录、勾选同步、提交、统计和全表读取的延迟中位数。
+
+用法: python benchmarks/bench_storage.py [--voters 1000] [--slogans 500] [--latency-ms 20]
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from _app import app, seed_slogans, seed_votes
+from memory_supabase import MemorySupabase
+from sqlite_supabase import SqliteSupabase
+
+
+def operations(client, n_slogans, rng):
+    """一次完整投票流程中的各项操作，每项只发出应用实际会发出的请求"""
+    voter_id = f"新评委{rng.random()}"
+    selection = rng.sample(range(1, n_slogans + 1), 20)
+    return [
+        ("登录读取记录", lambda: client.table('votes').select('slogan_id, voted').eq('voter_id', voter_id).execute()),
+        ("勾选同步(+20)", lambda: app.sync_voter_selection(client, voter_id, selection)),
+        ("勾选同步(-5+5)", lambda: app.sync_voter_selection(
+            client, voter_id, selection[5:] + rng.sample(range(1, n_slogans + 1), 5))),
+        ("单条 upsert", lambda: client.table('votes').upsert(
+            {'voter_id': voter_id, 'slogan_id': selection[0], 'voted': False},
+            on_conflict='voter_id,slogan_id').execute()),
+        ("提交投票", lambda: client.table('votes').update({'voted': True}).eq('voter_id', voter_id).execute()),
+        ("统计 vote_tally", lambda: client.rpc('vote_tally', {'p_limit': 10}).execute()),
+        ("统计 vote_summary", lambda: client.rpc('vote_summary').execute()),
+    ]
+
+
+def run(client, n_slogans, rounds):
+    rng = random.Random(1)
+    samples = {}
+    for _ in range(rounds):
+        for name, fn in operations(client, n_slogans, rng):
+            start = time.perf_counter()
+            fn()
+            samples.setdefault(name, []).append((time.perf_counter() - start) * 1000)
+    start = time.perf_counter()
+    sum(1 for _ in app.iter_votes('id, voter_id, slogan_id, voted, updated_at', client=client))
+    samples["分页读取全部投票"] = [(time.perf_counter() - start) * 1000]
+    return {name: statistics.median(values) for name, values in samples.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--voters", type=int, default=1000)
+    parser.add_argument("--slogans", type=int, default=500)
+    parser.add_argument("--rounds", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=20, help="内存替身注入的每次请求延迟")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        backends = [
+            (f"内存+{args.latency_ms:g}ms", MemorySupabase(latency=args.latency_ms / 1000)),
+            ("内存", MemorySupabase()),
+            ("SQLite", SqliteSupabase(os.path.join(directory, "votes.sqlite3"))),
+        ]
+        results = {}
+        for name, client in backends:
+            seed_slogans(client, args.slogans)
+            seed_votes(client, args.voters, args.slogans, min_votes=20, max_votes=20)
+            results[name] = run(client, args.slogans, args.rounds)
+        backends[-1][1].close()
+
+    print(f"{args.voters} 名评委 × 20 票，{args.slogans} 条口号，每项取 {args.rounds} 次的中位数 (ms)")
+    print(f"{'操作':<16}" + "".join(f"{name:>14}" for name in results))
+    for operation in next(iter(results.values())):
+        print(f"{operation:<16}" + "".join(f"{result[operation]:>14.3f}" for result in results.values()))
+
+
+if __name__ == "__main__":
+    main()
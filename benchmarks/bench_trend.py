@@ -0,0 +1,79 @@
+"""得票趋势：快照回放与重新扫描投票记录的对比
+
+按 --hours 小时内均匀提交的 --voters 名评委生成投票记录，比较
+1. 由 TallySnapshots 回放出前 10 名口号的趋势；
+2. 每次都从全部投票记录重新计算（解析时间、按时间段分组累加）。
+同时给出快照占用的条目数，以及由快照直接读取当前排名的耗时。
+
+用法: python benchmarks/bench_trend.py [--voters 5000] [--slogans 500] [--hours 72]
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from _app import app, make_ballots
+
+
+def make_records(n_voters, n_slogans, hours, picks=20, seed=0):
+    """每位评委 picks 票，提交时间在最近 hours 小时内均匀分布"""
+    rng = random.Random(seed)
+    start = time.time() - hours * 3600
+    records = []
+    for voter_id, slogan_ids, _ in make_ballots(n_voters, n_slogans, picks, picks, seed=seed):
+        updated_at = datetime.fromtimestamp(start + rng.random() * hours * 3600, timezone.utc).isoformat()
+        records.extend({'voter_id': voter_id, 'slogan_id': slogan_id, 'voted': True, 'updated_at': updated_at}
+                       for slogan_id in slogan_ids)
+    return records
+
+
+def rescan_trend(records, limit):
+    """不使用快照：从全部记录按时间段分组并累加"""
+    df = pd.DataFrame.from_records(records, columns=['voter_id', 'slogan_id', 'voted', 'updated_at'])
+    df = df[df['voted']]
+    at = pd.to_datetime(df['updated_at'], utc=True, format='ISO8601')
+    df = df.assign(bucket=at.dt.floor(f"{app.TALLY_SNAPSHOT_INTERVAL}s"))
+    top = df['slogan_id'].value_counts().sort_index().sort_values(ascending=False, kind='stable').index[:limit]
+    counts = df[df['slogan_id'].isin(top)].groupby(['bucket', 'slogan_id']).size().unstack(fill_value=0)
+    return counts.cumsum()[list(top)]
+
+
+def timed(fn, repeat=5):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--voters", type=int, default=5000)
+    parser.add_argument("--slogans", type=int, default=500)
+    parser.add_argument("--hours", type=float, default=72)
+    args = parser.parse_args()
+
+    records = make_records(args.voters, args.slogans, args.hours)
+    build_ms, snapshots = timed(lambda: app.TallySnapshots.from_records(records), repeat=1)
+    latest = snapshots.latest_counts
+    top = sorted(latest, key=lambda slogan_id: (-latest[slogan_id], slogan_id))[:app.TREND_TOP_N]
+
+    rank_ms, _ = timed(lambda: sorted(latest.items(), key=lambda item: (-item[1], item[0])))
+    replay_ms, trend = timed(lambda: snapshots.trend(top))
+    rescan_ms, reference = timed(lambda: rescan_trend(records, app.TREND_TOP_N))
+    assert trend.iloc[-1].tolist() == reference.iloc[-1].tolist()
+
+    print(f"{args.voters} 名评委 × 20 票，{args.hours:g} 小时，快照粒度 {app.TALLY_SNAPSHOT_INTERVAL}s")
+    print(f"快照: {len(snapshots)} 个，共 {len(snapshots.slogan_ids)} 个条目；由投票记录回溯 {build_ms:.0f}ms（仅首次加载）")
+    print(f"{'操作':<24}{'耗时(ms)':>12}")
+    print(f"{'当前排名（最新快照）':<24}{rank_ms:>12.2f}")
+    print(f"{'趋势（快照回放）':<24}{replay_ms:>12.2f}")
+    print(f"{'趋势（重新扫描记录）':<24}{rescan_ms:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""对比投票人汇总字典与 VoteMatrix 的统计耗时
+
+用法: python benchmarks/bench_vote_matrix.py [--voters 1000] [--slogans 5000]
+"""
+import argparse
+import time
+
+from _app import app, make_votes_data
+
+
+def dict_model_stats(votes_data):
+    """原有的纯 Python 统计方式"""
+    total_voters = len([v for v in votes_data.values() if v.get("voted", False)])
+    total_votes = sum(len(v.get("votes", [])) for v in votes_data.values() if v.get("voted", False))
+    pending_voters = len([v for v in votes_data.values() if
+                          not v.get("voted", False) and len(v.get("votes", [])) > 0])
+    vote_counts = {}
+    for voter_data in votes_data.values():
+        if voter_data.get("voted", False):
+            for slogan_id in voter_data.get("votes", []):
+                vote_counts[slogan_id] = vote_counts.get(slogan_id, 0) + 1
+    ranked = sorted(vote_counts.items(), key=lambda item: (-item[1], item[0]))
+    return total_voters, total_votes, pending_voters, ranked
+
+
+def matrix_stats(matrix):
+    summary = matrix.summary()
+    return summary['total_voters'], summary['total_votes'], summary['pending_voters'], matrix.tally()
+
+
+def best_of(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--voters", type=int, default=1000)
+    parser.add_argument("--slogans", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    votes_data = make_votes_data(args.voters, args.slogans)
+    catalog = range(1, args.slogans + 1)
+    matrix = app.VoteMatrix.from_votes_data(votes_data, catalog)
+    assert dict_model_stats(votes_data) == matrix_stats(matrix)
+
+    dict_ms = best_of(lambda: dict_model_stats(votes_data), args.repeat)
+    build_ms = best_of(lambda: app.VoteMatrix.from_votes_data(votes_data, catalog), args.repeat)
+    matrix_ms = best_of(lambda: matrix_stats(matrix), args.repeat)
+
+    print(f"{args.voters} 投票人 × {args.slogans} 口号, {int(matrix.indptr[-1])} 条选择")
+    print(f"  字典模型统计        {dict_ms:8.2f} ms")
+    print(f"  VoteMatrix 构建     {build_ms:8.2f} ms")
+    print(f"  VoteMatrix 统计     {matrix_ms:8.2f} ms")
+    print(f"  统计加速比          {dict_ms / matrix_ms:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
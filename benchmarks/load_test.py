@@ -0,0 +1,170 @@
+"""多会话并发压测：用 AppTest 模拟大量评委同时使用投票页
+
+每位虚拟评委在独立线程中驱动一个 AppTest 会话：登录、翻页、勾选若干口号、最终提交。
+所有会话共用同一个内存数据库（可注入请求延迟）和同一进程内的共享缓存 / 写入队列，
+与一个 Streamlit 进程服务多位评委的情况一致。对每个并发级别报告吞吐量、
+交互延迟 p50/p95/p99 和进程内存。
+
+用法: python benchmarks/load_test.py [--concurrency 1 5 10 20] [--toggles 5] [--latency-ms 20]
+"""
+import argparse
+import os
+import resource
+import statistics
+import threading
+import time
+
+from streamlit import logger
+from streamlit.runtime import Runtime
+from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+from streamlit.testing.v1 import AppTest
+
+from _app import app, seed_slogans
+from memory_supabase import MemorySupabase
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "vote2supabase.py")
+
+
+def share_runtime():
+    """让并发的 AppTest 会话共用一个运行时
+
+    AppTest 每次运行结束都会把全局 Runtime._instance 置空，
+    线程并发时会让其他仍在运行的会话报 "Runtime hasn't been created!"。
+    这里在置空后回落到第一次创建的运行时，相当于多个会话挂在同一个 Streamlit 进程上。
+    """
+    shared = {}
+    original_instance = Runtime.instance.__func__
+
+    def instance(cls):
+        if cls._instance is not None:
+            shared.setdefault('runtime', cls._instance)
+            return cls._instance
+        if 'runtime' in shared:
+            return shared['runtime']
+        return original_instance(cls)
+
+    Runtime.instance = classmethod(instance)
+    Runtime.exists = classmethod(lambda cls: cls._instance is not None or 'runtime' in shared)
+
+    # Python 3.11 的 ast.parse 不是线程安全的，每个 AppTest 都会重新编译脚本，这里串行化编译
+    compile_lock = threading.Lock()
+    original_get_bytecode = ScriptCache.get_bytecode
+
+    def get_bytecode(self, script_path):
+        with compile_lock:
+            return original_get_bytecode(self, script_path)
+
+    ScriptCache.get_bytecode = get_bytecode
+
+
+def current_rss_mb():
+    """当前进程常驻内存（MB）"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class VirtualVoter:
+    """一位虚拟评委的完整投票流程，记录每次交互（一次脚本运行）的耗时"""
+
+    def __init__(self, client, voter_id, toggles, pages):
+        self.client = client
+        self.voter_id = voter_id
+        self.toggles = toggles
+        self.pages = pages
+        self.latencies = []
+        self.error = None
+
+    def interact(self, action):
+        start = time.perf_counter()
+        action().run()
+        self.latencies.append((time.perf_counter() - start) * 1000)
+        if self.at.exception:
+            raise RuntimeError(self.at.exception[0].value)
+
+    def run(self):
+        try:
+            self.at = AppTest.from_file(APP_PATH, default_timeout=120)
+            self.at.session_state['supabase'] = self.client
+            self.interact(lambda: self.at)
+            self.at.text_input(key="voter_input").input(self.voter_id)
+            self.interact(lambda: self.at.button(key="start_vote").click())
+
+            for page in range(1, self.pages + 1):
+                if page > 1:
+                    self.interact(lambda: self.at.number_input(key="page_jump_top").set_value(page))
+                for i in range(self.toggles):
+                    slogan_id = (page - 1) * 50 + i + 1
+                    self.interact(lambda: self.at.checkbox(key=f"cb_{slogan_id}_{page}").check())
+
+            self.interact(lambda: self.at.button(key="final_submit").click())
+        except Exception as e:
+            self.error = e
+
+
+def run_level(client, concurrency, toggles, pages, level):
+    voters = [VirtualVoter(client, f"压测{level}-{i}", toggles, pages) for i in range(concurrency)]
+    threads = [threading.Thread(target=voter.run) for voter in voters]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    latencies = [ms for voter in voters for ms in voter.latencies]
+    errors = [voter.error for voter in voters if voter.error]
+    return {
+        'concurrency': concurrency,
+        'interactions': len(latencies),
+        'throughput': len(latencies) / elapsed,
+        'p50': percentile(latencies, 0.50),
+        'p95': percentile(latencies, 0.95),
+        'p99': percentile(latencies, 0.99),
+        'mean': statistics.fmean(latencies),
+        'rss_mb': current_rss_mb(),
+        'errors': errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 5, 10, 20])
+    parser.add_argument("--toggles", type=int, default=5, help="每页勾选的口号数")
+    parser.add_argument("--pages", type=int, default=2, help="浏览的页数")
+    parser.add_argument("--slogans", type=int, default=500)
+    parser.add_argument("--latency-ms", type=float, default=20)
+    args = parser.parse_args()
+    logger.set_log_level("error")
+    share_runtime()
+
+    client = MemorySupabase(latency=args.latency_ms / 1000)
+    seed_slogans(client, args.slogans)
+    instrumented = app.InstrumentedClient(client, app.get_supabase_metrics())
+
+    print(f"{args.slogans} 条口号，每次请求注入 {args.latency_ms:g}ms 延迟，"
+          f"每位评委 {args.pages} 页 × {args.toggles} 次勾选后提交")
+    print(f"{'并发':>6}{'交互数':>8}{'吞吐(次/秒)':>14}{'p50(ms)':>10}{'p95(ms)':>10}"
+          f"{'p99(ms)':>10}{'内存(MB)':>10}{'失败':>6}")
+    for level, concurrency in enumerate(args.concurrency):
+        result = run_level(instrumented, concurrency, args.toggles, args.pages, level)
+        print(f"{result['concurrency']:>8}{result['interactions']:>10}{result['throughput']:>16.1f}"
+              f"{result['p50']:>12.1f}{result['p95']:>10.1f}{result['p99']:>10.1f}"
+              f"{result['rss_mb']:>12.1f}{len(result['errors']):>6}")
+        for error in result['errors'][:3]:
+            print(f"    {type(error).__name__}: {error}")
+
+    app.get_write_queue().flush_all()
+    submitted = {row['voter_id'] for row in client.tables['votes'] if row['voted']}
+    print(f"已提交评委 {len(submitted)} 位，数据库请求 {client.request_count} 次")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,414 @@
+"""Supabase 客户端的内存替身
+
+按应用用到的 PostgREST 查询构造器语义实现 slogans / votes / vote_settings 三张表，
+以及 supabase/migrations 中定义的数据库函数，用于在无网络环境下运行应用和基准脚本：
+
+    client = MemorySupabase(latency=0.02)
+    client.table('votes').select('slogan_id').eq('voter_id', '张三').execute().data
+
+subscribe() 提供与 Supabase Realtime postgres_changes 相同负载格式的行变化推送。
+设置环境变量 SUPABASE_BACKEND=memory 后应用会使用它代替托管数据库。
+"""
+import bisect
+import itertools
+import operator
+import random
+import threading
+import time
+from datetime import datetime, timezone
+
+
+# vote_settings 表中选择上限的初始值，与 supabase/migrations/009_vote_settings.sql 写入的初始行一致；
+# 运行时 set_selection 和应用都读取表中的这一行
+DEFAULT_MAX_VOTES = 20
+
+OPERATORS = {
+    'eq': operator.eq,
+    'neq': operator.ne,
+    'gt': operator.gt,
+    'gte': operator.ge,
+    'lt': operator.lt,
+    'lte': operator.le,
+    'in': lambda value, values: value in values,
+}
+
+
+def matches(row, filters):
+    """行是否满足全部过滤条件；值为 NULL 时只参与 eq / neq 比较，其余比较一律不满足"""
+    for column, op, value in filters:
+        current = row.get(column)
+        if current is None and op not in ('eq', 'neq'):
+            return False
+        if not OPERATORS[op](current, value):
+            return False
+    return True
+
+
+class APIError(Exception):
+    """数据库拒绝的请求，与 postgrest.APIError 一样带有 message 和 SQLSTATE 错误码 code"""
+
+    def __init__(self, message, code):
+        super().__init__(message)
+        self.message = message
+        self.code = code
+
+
+class APIResponse:
+    """与 postgrest 返回值一致的 data / count 属性"""
+
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+
+class MemoryQuery:
+    """单次查询的构造器，filter 方法返回自身以便链式调用"""
+
+    def __init__(self, client, table_name):
+        self.client = client
+        self.table_name = table_name
+        self.method = None
+        self.columns = None
+        self.count = None
+        self.payload = None
+        self.on_conflict = None
+        self.filters = []
+        self.order_by = []
+        self.limit_count = None
+        self.offset = 0
+
+    # 操作
+    def select(self, *columns, count=None, head=None):
+        self.method = 'select'
+        self.columns = [c.strip() for c in ','.join(columns or ['*']).split(',')]
+        self.count = count
+        return self
+
+    def insert(self, json, **kwargs):
+        self.method = 'insert'
+        self.payload = json
+        return self
+
+    def upsert(self, json, on_conflict='', **kwargs):
+        self.method = 'upsert'
+        self.payload = json
+        self.on_conflict = [c.strip() for c in on_conflict.split(',') if c.strip()]
+        return self
+
+    def update(self, json, **kwargs):
+        self.method = 'update'
+        self.payload = json
+        return self
+
+    def delete(self, **kwargs):
+        self.method = 'delete'
+        return self
+
+    # 过滤
+    def _filter(self, column, op, value):
+        self.filters.append((column, op, value))
+        return self
+
+    def eq(self, column, value):
+        return self._filter(column, 'eq', value)
+
+    def neq(self, column, value):
+        return self._filter(column, 'neq', value)
+
+    def gt(self, column, value):
+        return self._filter(column, 'gt', value)
+
+    def gte(self, column, value):
+        return self._filter(column, 'gte', value)
+
+    def lt(self, column, value):
+        return self._filter(column, 'lt', value)
+
+    def lte(self, column, value):
+        return self._filter(column, 'lte', value)
+
+    def in_(self, column, values):
+        return self._filter(column, 'in', frozenset(values))
+
+    # 排序与分页
+    def order(self, column, *, desc=False, **kwargs):
+        self.order_by.append((column, desc))
+        return self
+
+    def limit(self, size, **kwargs):
+        self.limit_count = size
+        return self
+
+    def range(self, start, end, **kwargs):
+        self.offset = start
+        self.limit_count = end - start + 1
+        return self
+
+    def execute(self):
+        return self.client._execute(self)
+
+
+class MemoryRpc:
+    """rpc() 返回的调用对象"""
+
+    def __init__(self, client, fn, params):
+        self.client = client
+        self.fn = fn
+        self.params = params
+
+    def execute(self):
+        return self.client._execute_rpc(self.fn, self.params)
+
+
+def change_payload(table_name, change_type, record=None, old_record=None):
+    """构造与 Supabase Realtime postgres_changes 推送一致的负载"""
+    return {
+        'data': {
+            'schema': 'public',
+            'table': table_name,
+            'commit_timestamp': datetime.now(timezone.utc).isoformat(),
+            'type': change_type,
+            'errors': None,
+            'columns': [],
+            'record': dict(record) if record is not None else {},
+            'old_record': dict(old_record) if old_record is not None else {},
+        },
+        'ids': [],
+    }
+
+
+class MemorySupabase:
+    """线程安全的内存数据库，table() 返回 MemoryQuery，rpc() 返回 MemoryRpc
+
+    latency 为每次请求注入的延迟（秒），jitter 为在其上叠加的均匀随机抖动（秒）；
+    延迟在锁外等待，多个线程的请求可以并发。request_count 累计已执行的请求数。
+    subscribe() 注册的回调在每次写入提交后按提交顺序收到逐行的变化推送，
+    旧记录为完整行（相当于表设置了 REPLICA IDENTITY FULL）。
+    """
+
+    def __init__(self, latency=0.0, jitter=0.0, seed=None):
+        self.tables = {'slogans': [], 'votes': [], 'vote_settings': [{'id': 1, 'max_votes': DEFAULT_MAX_VOTES}]}
+        self.latency = latency
+        self.jitter = jitter
+        self.request_count = 0
+        self._random = random.Random(seed)
+        self._ids = {}
+        self._lock = threading.Lock()
+        self._listeners = {}
+        self._changes = []
+        self._dispatch_lock = threading.Lock()
+
+    def table(self, table_name):
+        return MemoryQuery(self, table_name)
+
+    def rpc(self, fn, params=None):
+        return MemoryRpc(self, fn, params or {})
+
+    def subscribe(self, table_name, callback):
+        """订阅某张表的行变化，返回取消订阅的函数"""
+        with self._lock:
+            self._listeners.setdefault(table_name, []).append(callback)
+
+        def unsubscribe():
+            with self._lock:
+                self._listeners[table_name].remove(callback)
+        return unsubscribe
+
+    def _wait(self):
+        delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0)
+        if delay > 0:
+            time.sleep(delay)
+
+    def _next_id(self, table_name):
+        return next(self._ids.setdefault(table_name, itertools.count(1)))
+
+    def _execute(self, query):
+        def run():
+            rows = self.tables.setdefault(query.table_name, [])
+            data, count = getattr(self, f'_{query.method}')(query, rows)
+            return APIResponse([dict(row) for row in data], count)
+        return self._transact(query.table_name, run)
+
+    def _transact(self, table_name, run):
+        """在表锁内执行一次请求，提交后把本次写入的行变化推送给 table_name 的订阅者"""
+        self._wait()
+        self._lock.acquire()
+        try:
+            self.request_count += 1
+            self._changes = []
+            response = run()
+            changes, self._changes = self._changes, []
+            listeners = list(self._listeners.get(table_name, ()))
+            if not (changes and listeners):
+                return response
+            # 先取得推送锁再释放表锁，保证推送顺序与提交顺序一致；回调在表锁外执行
+            self._dispatch_lock.acquire()
+        finally:
+            self._lock.release()
+
+        try:
+            for payload in changes:
+                for callback in listeners:
+                    callback(payload)
+        finally:
+            self._dispatch_lock.release()
+        return response
+
+    def _record_change(self, table_name, change_type, record=None, old_record=None):
+        if self._listeners.get(table_name):
+            self._changes.append(change_payload(table_name, change_type, record, old_record))
+
+    @staticmethod
+    def _scan(query, rows):
+        """逐行扫描满足过滤条件的行
+
+        表内各行按 id 递增存放，id 上的 gt / gte 条件像主键索引一样二分定位起点，
+        使按 id 键集分页的每一页无需从头扫描。
+        """
+        start = 0
+        for column, op, value in query.filters:
+            if column == 'id' and op in ('gt', 'gte'):
+                find = bisect.bisect_right if op == 'gt' else bisect.bisect_left
+                start = max(start, find(rows, value, key=lambda row: row['id']))
+        return (row for row in itertools.islice(rows, start, None) if matches(row, query.filters))
+
+    def _select(self, query, rows):
+        matched = self._scan(query, rows)
+        end = None if query.limit_count is None else query.offset + query.limit_count
+        if not query.count and query.order_by in ([], [('id', False)]):
+            # 已按 id 有序，取够一页即可停止扫描
+            matched = list(itertools.islice(matched, query.offset, end))
+            count = None
+        else:
+            matched = list(matched)
+            for column, desc in reversed(query.order_by):
+                matched.sort(key=lambda row: (row.get(column) is None, row.get(column)), reverse=desc)
+            count = len(matched) if query.count else None
+            matched = matched[query.offset:end]
+        if query.columns != ['*']:
+            matched = [{column: row.get(column) for column in query.columns} for row in matched]
+        return matched, count
+
+    def _new_row(self, table_name, values):
+        now = datetime.now(timezone.utc).isoformat()
+        row = {'id': self._next_id(table_name)}
+        if table_name == 'votes':
+            row.update({'voted': False, 'created_at': now})
+        row.update(values)
+        if table_name == 'votes':
+            # 与数据库触发器一致，由服务端维护 updated_at
+            row['updated_at'] = now
+        return row
+
+    def _insert(self, query, rows):
+        payload = query.payload if isinstance(query.payload, list) else [query.payload]
+        inserted = [self._new_row(query.table_name, values) for values in payload]
+        rows.extend(inserted)
+        for row in inserted:
+            self._record_change(query.table_name, 'INSERT', row)
+        return inserted, None
+
+    def _upsert(self, query, rows):
+        payload = query.payload if isinstance(query.payload, list) else [query.payload]
+        keys = query.on_conflict or ['id']
+        index = {tuple(row.get(k) for k in keys): row for row in rows}
+        result = []
+        for values in payload:
+            existing = index.get(tuple(values.get(k) for k in keys))
+            if existing is None:
+                existing = self._new_row(query.table_name, values)
+                rows.append(existing)
+                index[tuple(existing.get(k) for k in keys)] = existing
+                self._record_change(query.table_name, 'INSERT', existing)
+            else:
+                old_record = dict(existing)
+                existing.update(values)
+                self._touch(query.table_name, existing)
+                self._record_change(query.table_name, 'UPDATE', existing, old_record)
+            result.append(existing)
+        return result, None
+
+    def _update(self, query, rows):
+        matched = list(self._scan(query, rows))
+        for row in matched:
+            old_record = dict(row)
+            row.update(query.payload)
+            self._touch(query.table_name, row)
+            self._record_change(query.table_name, 'UPDATE', row, old_record)
+        return matched, None
+
+    def _delete(self, query, rows):
+        matched = list(self._scan(query, rows))
+        doomed = {id(row) for row in matched}
+        rows[:] = [row for row in rows if id(row) not in doomed]
+        for row in matched:
+            self._record_change(query.table_name, 'DELETE', old_record=row)
+        return matched, None
+
+    def _execute_rpc(self, fn, params):
+        handler = getattr(self, f'_rpc_{fn}', None)
+        if handler is None:
+            raise ValueError(f"function {fn} does not exist")
+        # 数据库函数都作用于 votes 表
+        return self._transact('votes', lambda: APIResponse(handler(**params)))
+
+    def _rpc_set_selection(self, p_voter_id, p_slogan_ids):
+        wanted = set(p_slogan_ids or ())
+        max_votes = self.tables['vote_settings'][0]['max_votes']
+        if len(wanted) > max_votes:
+            raise APIError(f"最多只能选择 {max_votes} 条口号", '23514')
+        rows = self.tables['votes']
+        mine = [row for row in rows if row['voter_id'] == p_voter_id]
+        if any(row.get('voted') for row in mine):
+            raise APIError("投票已提交，不能再修改选择", '23514')
+
+        removed = [row for row in mine if row['slogan_id'] not in wanted]
+        if removed:
+            doomed = {id(row) for row in removed}
+            rows[:] = [row for row in rows if id(row) not in doomed]
+            for row in removed:
+                self._record_change('votes', 'DELETE', old_record=row)
+        existing = {row['slogan_id'] for row in mine}
+        added = sorted(wanted - existing)
+        for slogan_id in added:
+            row = self._new_row('votes', {'voter_id': p_voter_id, 'slogan_id': slogan_id, 'voted': False})
+            rows.append(row)
+            self._record_change('votes', 'INSERT', row)
+        return [{'added': len(added), 'removed': len(removed)}]
+
+    def _rpc_submit_selection(self, p_voter_id, p_voted=True):
+        updated = [row for row in self.tables['votes'] if row['voter_id'] == p_voter_id]
+        for row in updated:
+            old_record = dict(row)
+            row['voted'] = p_voted
+            self._touch('votes', row)
+            self._record_change('votes', 'UPDATE', row, old_record)
+        return [{'updated': len(updated)}]
+
+    def _rpc_vote_tally(self, p_limit=None):
+        vote_counts = {}
+        for row in self.tables['votes']:
+            if row.get('voted'):
+                vote_counts[row['slogan_id']] = vote_counts.get(row['slogan_id'], 0) + 1
+        ranked = sorted(vote_counts.items(), key=lambda item: (-item[1], item[0]))
+        if p_limit is not None:
+            ranked = ranked[:p_limit]
+        return [{'slogan_id': slogan_id, 'vote_count': count} for slogan_id, count in ranked]
+
+    def _rpc_vote_summary(self):
+        per_voter = {}
+        for row in self.tables['votes']:
+            voted, count = per_voter.get(row['voter_id'], (False, 0))
+            per_voter[row['voter_id']] = (voted or bool(row.get('voted')), count + 1)
+        submitted = [count for voted, count in per_voter.values() if voted]
+        return [{
+            'total_voters': len(submitted),
+            'total_votes': sum(submitted),
+            'total_registered': len(per_voter),
+            'pending_voters': len(per_voter) - len(submitted)
+        }]
+
+    @staticmethod
+    def _touch(table_name, row):
+        if table_name == 'votes':
+            row['updated_at'] = datetime.now(timezone.utc).isoformat()
@@ -0,0 +1,369 @@
+"""基于 SQLite 的本地存储后端
+
+实现与 memory_supabase 相同的 Supabase 客户端子集（table() 查询构造器、rpc() 数据库函数、
+subscribe() 行变化推送），查询被翻译为参数化 SQL 在本地数据库文件上执行，用于无托管数据库的现场部署：
+
+    client = SqliteSupabase("votes.sqlite3")
+    client.table('votes').select('slogan_id').eq('voter_id', '张三').execute().data
+
+数据库使用 WAL 模式，读取不阻塞写入；同一条 SQL 文本由 sqlite3 的语句缓存复用预编译语句。
+一次请求中的批量写入在同一个事务中完成。设置环境变量 SUPABASE_BACKEND=sqlite 后应用会使用它。
+"""
+import sqlite3
+import threading
+from datetime import datetime, timezone
+
+from memory_supabase import DEFAULT_MAX_VOTES, APIError, APIResponse, MemoryQuery, MemoryRpc, change_payload
+
+
+SCHEMA = """
+create table if not exists slogans (
+    id integer primary key autoincrement,
+    serial_number integer not null unique,
+    slogan_text text not null
+);
+
+create table if not exists votes (
+    id integer primary key autoincrement,
+    voter_id text not null,
+    slogan_id integer not null,
+    voted integer not null default 0,
+    created_at text not null,
+    updated_at text not null,
+    unique (voter_id, slogan_id)
+);
+
+create index if not exists votes_updated_at_idx on votes (updated_at, id);
+create index if not exists votes_submitted_slogan_idx on votes (slogan_id) where voted;
+
+create table if not exists vote_settings (
+    id integer primary key default 1 check (id = 1),
+    max_votes integer not null check (max_votes > 0)
+);
+"""
+
+# 各表的列，查询中出现的列名必须在此之内，不会把任意字符串拼进 SQL
+COLUMNS = {
+    'slogans': ('id', 'serial_number', 'slogan_text'),
+    'votes': ('id', 'voter_id', 'slogan_id', 'voted', 'created_at', 'updated_at'),
+    'vote_settings': ('id', 'max_votes'),
+}
+
+BOOLEAN_COLUMNS = {'voted'}
+
+COMPARISONS = {
+    'eq': '=',
+    'neq': '!=',
+    'gt': '>',
+    'gte': '>=',
+    'lt': '<',
+    'lte': '<=',
+}
+
+VOTE_TALLY_SQL = """
+select slogan_id, count(*) as vote_count
+from votes
+where voted
+group by slogan_id
+order by vote_count desc, slogan_id
+limit ?
+"""
+
+VOTE_SUMMARY_SQL = """
+with per_voter as (
+    select voter_id, max(voted) as voted, count(*) as vote_count
+    from votes
+    group by voter_id
+)
+select
+    count(*) filter (where voted) as total_voters,
+    coalesce(sum(vote_count) filter (where voted), 0) as total_votes,
+    count(*) as total_registered,
+    count(*) filter (where not voted) as pending_voters
+from per_voter
+"""
+
+
+def utc_now_iso():
+    """定长的UTC时间字符串，按字符串比较即按时间先后比较"""
+    return datetime.now(timezone.utc).isoformat(timespec='microseconds')
+
+
+def check_column(table_name, column):
+    if column not in COLUMNS[table_name]:
+        raise ValueError(f"column {table_name}.{column} does not exist")
+    return column
+
+
+def where_clause(query):
+    """把查询的过滤条件翻译为 WHERE 子句和参数"""
+    conditions = []
+    params = []
+    for column, op, value in query.filters:
+        check_column(query.table_name, column)
+        if op == 'in':
+            values = sorted(value, key=str)
+            if not values:
+                conditions.append('0')
+                continue
+            conditions.append(f"{column} in ({', '.join('?' * len(values))})")
+            params.extend(values)
+        elif value is None and op in ('eq', 'neq'):
+            conditions.append(f"{column} is {'not ' if op == 'neq' else ''}null")
+        else:
+            conditions.append(f"{column} {COMPARISONS[op]} ?")
+            params.append(value)
+    if not conditions:
+        return '', params
+    return ' where ' + ' and '.join(conditions), params
+
+
+def to_record(row):
+    """sqlite3.Row 转为字典，布尔列还原为 bool"""
+    record = dict(row)
+    for column in BOOLEAN_COLUMNS & record.keys():
+        record[column] = bool(record[column])
+    return record
+
+
+class SqliteSupabase:
+    """SQLite 数据库文件上的 Supabase 客户端替身，table() 返回查询构造器，rpc() 调用数据库函数
+
+    每个线程使用各自的连接（WAL 模式下读取可以并发）；写入请求在进程内串行执行，
+    每个请求是一个事务。votes 表的 created_at / updated_at 由后端维护，与数据库触发器一致。
+    subscribe() 注册的回调在每次写入提交后按提交顺序收到逐行的变化推送。
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.request_count = 0
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._listeners = {}
+        conn = self._connection()
+        conn.executescript(SCHEMA)
+        conn.execute("insert or ignore into vote_settings (id, max_votes) values (1, ?)", [DEFAULT_MAX_VOTES])
+
+    def table(self, table_name):
+        if table_name not in COLUMNS:
+            raise ValueError(f"table {table_name} does not exist")
+        return MemoryQuery(self, table_name)
+
+    def rpc(self, fn, params=None):
+        return MemoryRpc(self, fn, params or {})
+
+    def subscribe(self, table_name, callback):
+        """订阅某张表的行变化，返回取消订阅的函数"""
+        with self._write_lock:
+            self._listeners.setdefault(table_name, []).append(callback)
+
+        def unsubscribe():
+            with self._write_lock:
+                self._listeners[table_name].remove(callback)
+        return unsubscribe
+
+    def close(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, cached_statements=256)
+            conn.row_factory = sqlite3.Row
+            conn.execute('pragma journal_mode = wal')
+            conn.execute('pragma synchronous = normal')
+            conn.execute('pragma foreign_keys = on')
+            self._local.conn = conn
+        return conn
+
+    def _execute(self, query):
+        self.request_count += 1
+        conn = self._connection()
+        if query.method == 'select':
+            return self._select(conn, query)
+
+        handler = getattr(self, f'_{query.method}')
+        return APIResponse(self._transact(query.table_name, lambda changes: handler(conn, query, changes)))
+
+    def _transact(self, table_name, run):
+        """在一个写事务中执行 run(changes)，提交后把收集到的行变化推送给 table_name 的订阅者
+
+        没有订阅者时 changes 为 None，写入方无需为推送额外读取旧记录。
+        """
+        conn = self._connection()
+        with self._write_lock:
+            listeners = list(self._listeners.get(table_name, ()))
+            changes = [] if listeners else None
+            conn.execute('begin immediate')
+            try:
+                data = run(changes)
+                conn.execute('commit')
+            except BaseException:
+                conn.execute('rollback')
+                raise
+            for payload in changes or ():
+                for callback in listeners:
+                    callback(payload)
+        return data
+
+    def _select(self, conn, query):
+        columns = '*' if query.columns == ['*'] else \
+            ', '.join(check_column(query.table_name, column) for column in query.columns)
+        where, params = where_clause(query)
+        sql = f"select {columns} from {query.table_name}{where}"
+        if query.order_by:
+            sql += ' order by ' + ', '.join(
+                f"{check_column(query.table_name, column)}{' desc' if desc else ''}"
+                for column, desc in query.order_by
+            )
+        if query.limit_count is not None or query.offset:
+            sql += ' limit ? offset ?'
+            params = params + [-1 if query.limit_count is None else query.limit_count, query.offset]
+        data = [to_record(row) for row in conn.execute(sql, params)]
+
+        count = None
+        if query.count:
+            count_where, count_params = where_clause(query)
+            count = conn.execute(f"select count(*) from {query.table_name}{count_where}", count_params).fetchone()[0]
+        return APIResponse(data, count)
+
+    def _rows(self, query):
+        """待写入的行，以及只在新插入时生效、冲突更新时不覆盖的默认列"""
+        payload = query.payload if isinstance(query.payload, list) else [query.payload]
+        if query.table_name != 'votes' or not payload:
+            return payload, set()
+        now = utc_now_iso()
+        defaults = {'voted': False, 'created_at': now}
+        # 与数据库触发器一致，由服务端维护 updated_at
+        rows = [{**defaults, **values, 'updated_at': now} for values in payload]
+        return rows, defaults.keys() - payload[0].keys()
+
+    def _insert(self, conn, query, changes):
+        rows, _ = self._rows(query)
+        return self._write_rows(conn, query, rows, changes)
+
+    def _upsert(self, conn, query, changes):
+        rows, defaulted = self._rows(query)
+        return self._write_rows(conn, query, rows, changes,
+                                conflict_keys=query.on_conflict or ['id'], keep=defaulted)
+
+    def _write_rows(self, conn, query, rows, changes, conflict_keys=None, keep=()):
+        """逐行执行同一条预编译的 INSERT（冲突时 UPDATE），全部在当前事务中"""
+        if not rows:
+            return []
+        table_name = query.table_name
+        columns = [check_column(table_name, column) for column in rows[0]]
+        sql = f"insert into {table_name} ({', '.join(columns)}) values ({', '.join('?' * len(columns))})"
+        if conflict_keys:
+            keys = [check_column(table_name, column) for column in conflict_keys]
+            updates = [column for column in columns if column not in keys and column not in keep]
+            sql += f" on conflict ({', '.join(keys)}) do " + (
+                'update set ' + ', '.join(f"{column} = excluded.{column}" for column in updates)
+                if updates else 'nothing'
+            )
+            lookup = f"select * from {table_name} where " + ' and '.join(f"{key} = ?" for key in keys)
+        sql += ' returning *'
+
+        result = []
+        for values in rows:
+            if len(values) != len(columns) or any(column not in values for column in columns):
+                raise ValueError("all rows in a bulk write must have the same columns")
+            old_row = None
+            if conflict_keys and changes is not None:
+                old_row = conn.execute(lookup, [values[key] for key in conflict_keys]).fetchone()
+            row = conn.execute(sql, [values[column] for column in columns]).fetchone()
+            if row is None:
+                continue
+            record = to_record(row)
+            result.append(record)
+            if changes is not None:
+                if old_row is None:
+                    changes.append(change_payload(table_name, 'INSERT', record))
+                else:
+                    changes.append(change_payload(table_name, 'UPDATE', record, to_record(old_row)))
+        return result
+
+    def _update(self, conn, query, changes):
+        values = dict(query.payload)
+        if query.table_name == 'votes':
+            values['updated_at'] = utc_now_iso()
+        assignments = ', '.join(f"{check_column(query.table_name, column)} = ?" for column in values)
+        where, params = where_clause(query)
+
+        old_rows = {}
+        if changes is not None:
+            old_rows = {row['id']: to_record(row)
+                        for row in conn.execute(f"select * from {query.table_name}{where}", params)}
+        rows = conn.execute(f"update {query.table_name} set {assignments}{where} returning *",
+                            list(values.values()) + params).fetchall()
+        result = [to_record(row) for row in rows]
+        if changes is not None:
+            for record in result:
+                changes.append(change_payload(query.table_name, 'UPDATE', record, old_rows.get(record['id'])))
+        return result
+
+    def _delete(self, conn, query, changes):
+        where, params = where_clause(query)
+        rows = conn.execute(f"delete from {query.table_name}{where} returning *", params).fetchall()
+        result = [to_record(row) for row in rows]
+        if changes is not None:
+            for record in result:
+                changes.append(change_payload(query.table_name, 'DELETE', old_record=record))
+        return result
+
+    def _execute_rpc(self, fn, params):
+        self.request_count += 1
+        conn = self._connection()
+        if fn == 'vote_tally':
+            limit = params.get('p_limit')
+            rows = conn.execute(VOTE_TALLY_SQL, [-1 if limit is None else limit])
+        elif fn == 'vote_summary':
+            rows = conn.execute(VOTE_SUMMARY_SQL)
+        elif fn == 'set_selection':
+            return APIResponse(self._transact('votes', lambda changes: self._set_selection(conn, changes, **params)))
+        elif fn == 'submit_selection':
+            return APIResponse(self._transact('votes', lambda changes: self._submit_selection(conn, changes, **params)))
+        else:
+            raise ValueError(f"function {fn} does not exist")
+        return APIResponse([dict(row) for row in rows])
+
+    def _set_selection(self, conn, changes, p_voter_id, p_slogan_ids):
+        """supabase/migrations/009_vote_settings.sql 中 set_selection 的实现：整体替换投票人的草稿选择"""
+        wanted = sorted(set(p_slogan_ids or ()))
+        max_votes = conn.execute("select max_votes from vote_settings where id = 1").fetchone()[0]
+        if len(wanted) > max_votes:
+            raise APIError(f"最多只能选择 {max_votes} 条口号", '23514')
+        if conn.execute("select 1 from votes where voter_id = ? and voted limit 1", [p_voter_id]).fetchone():
+            raise APIError("投票已提交，不能再修改选择", '23514')
+
+        removed = conn.execute(
+            f"delete from votes where voter_id = ? and slogan_id not in ({', '.join('?' * len(wanted))}) returning *",
+            [p_voter_id] + wanted
+        ).fetchall()
+        now = utc_now_iso()
+        added = []
+        for slogan_id in wanted:
+            row = conn.execute(
+                "insert into votes (voter_id, slogan_id, voted, created_at, updated_at) values (?, ?, 0, ?, ?) "
+                "on conflict (voter_id, slogan_id) do nothing returning *",
+                [p_voter_id, slogan_id, now, now]
+            ).fetchone()
+            if row is not None:
+                added.append(row)
+        if changes is not None:
+            changes.extend(change_payload('votes', 'DELETE', old_record=to_record(row)) for row in removed)
+            changes.extend(change_payload('votes', 'INSERT', to_record(row)) for row in added)
+        return [{'added': len(added), 'removed': len(removed)}]
+
+    def _submit_selection(self, conn, changes, p_voter_id, p_voted=True):
+        """supabase/migrations/007_submit_selection.sql 的实现：在写事务中提交（或撤销提交）投票人的全部选择"""
+        old_rows = {row['id']: to_record(row)
+                    for row in conn.execute("select * from votes where voter_id = ?", [p_voter_id])}
+        rows = conn.execute("update votes set voted = ?, updated_at = ? where voter_id = ? returning *",
+                            [p_voted, utc_now_iso(), p_voter_id]).fetchall()
+        if changes is not None:
+            changes.extend(change_payload('votes', 'UPDATE', to_record(row), old_rows.get(row['id'])) for row in rows)
+        return [{'updated': len(rows)}]
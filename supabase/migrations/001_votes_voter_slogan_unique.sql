@@ -0,0 +1,10 @@
+-- 批量 upsert 依赖 (voter_id, slogan_id) 唯一约束作为冲突键
+-- 先清理历史重复记录，只保留 id 最小的一条
+delete from votes a
+using votes b
+where a.voter_id = b.voter_id
+  and a.slogan_id = b.slogan_id
+  and a.id > b.id;
+
+alter table votes
+    add constraint votes_voter_id_slogan_id_key unique (voter_id, slogan_id);
@@ -0,0 +1,17 @@
+-- 共享投票缓存按 updated_at 水位线增量拉取，要求 updated_at 由数据库统一维护
+create or replace function votes_touch_updated_at()
+returns trigger
+language plpgsql
+as $$
+begin
+    new.updated_at := now();
+    return new;
+end;
+$$;
+
+drop trigger if exists votes_touch_updated_at on votes;
+create trigger votes_touch_updated_at
+    before insert or update on votes
+    for each row execute function votes_touch_updated_at();
+
+create index if not exists votes_updated_at_idx on votes (updated_at, id);
@@ -0,0 +1,33 @@
+-- 管理员结果页的排名与汇总由数据库计算，客户端只取排好序的结果行
+create index if not exists votes_submitted_slogan_idx on votes (slogan_id) where voted;
+
+create or replace function vote_tally(p_limit int default null)
+returns table (slogan_id int, vote_count bigint)
+language sql
+stable
+as $$
+    select v.slogan_id, count(*) as vote_count
+    from votes v
+    where v.voted
+    group by v.slogan_id
+    order by vote_count desc, v.slogan_id
+    limit p_limit;
+$$;
+
+create or replace function vote_summary()
+returns table (total_voters bigint, total_votes bigint, total_registered bigint, pending_voters bigint)
+language sql
+stable
+as $$
+    with per_voter as (
+        select voter_id, bool_or(voted) as voted, count(*) as vote_count
+        from votes
+        group by voter_id
+    )
+    select
+        count(*) filter (where voted),
+        coalesce(sum(vote_count) filter (where voted), 0),
+        count(*),
+        count(*) filter (where not voted)
+    from per_voter;
+$$;
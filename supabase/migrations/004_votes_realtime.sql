@@ -0,0 +1,13 @@
+-- 管理员界面通过 Supabase Realtime 订阅 votes 表的行变化，增量更新统计和排名
+-- 删除和更新推送需要带上完整的旧记录（voter_id / slogan_id / voted），才能撤销其计数
+alter table votes replica identity full;
+
+do $$
+begin
+    if not exists (
+        select 1 from pg_publication_tables
+        where pubname = 'supabase_realtime' and schemaname = 'public' and tablename = 'votes'
+    ) then
+        alter publication supabase_realtime add table votes;
+    end if;
+end $$;
@@ -0,0 +1,9 @@
+-- 口号目录按序号做差异同步，批量 upsert 依赖 serial_number 唯一约束作为冲突键
+-- 先清理历史重复记录，只保留 id 最小的一条
+delete from slogans a
+using slogans b
+where a.serial_number = b.serial_number
+  and a.id > b.id;
+
+alter table slogans
+    add constraint slogans_serial_number_key unique (serial_number);
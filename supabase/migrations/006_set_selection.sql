@@ -0,0 +1,37 @@
+-- 投票人的草稿选择由一次调用在数据库中整体替换：客户端不必先查询当前记录，
+-- 同一投票人的并发调用（多个标签页）按投票人排队执行，选择数量的上限由数据库保证
+create or replace function set_selection(p_voter_id text, p_slogan_ids int[])
+returns table (added int, removed int)
+language plpgsql
+as $$
+declare
+    max_votes constant int := 20;
+    v_slogan_ids int[] := array(select distinct s from unnest(coalesce(p_slogan_ids, '{}')) s);
+    v_added int;
+    v_removed int;
+begin
+    if cardinality(v_slogan_ids) > max_votes then
+        raise exception '最多只能选择 % 条口号', max_votes using errcode = 'check_violation';
+    end if;
+
+    -- 事务级锁，提交或回滚时释放；同一投票人的下一次调用看到的是本次替换后的选择
+    perform pg_advisory_xact_lock(hashtext('set_selection:' || p_voter_id));
+
+    if exists (select 1 from votes v where v.voter_id = p_voter_id and v.voted) then
+        raise exception '投票已提交，不能再修改选择' using errcode = 'check_violation';
+    end if;
+
+    delete from votes v
+    where v.voter_id = p_voter_id
+      and v.slogan_id <> all (v_slogan_ids);
+    get diagnostics v_removed = row_count;
+
+    insert into votes (voter_id, slogan_id, voted, created_at, updated_at)
+    select p_voter_id, s, false, now(), now()
+    from unnest(v_slogan_ids) s
+    on conflict (voter_id, slogan_id) do nothing;
+    get diagnostics v_added = row_count;
+
+    return query select v_added, v_removed;
+end;
+$$;
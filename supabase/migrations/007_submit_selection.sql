@@ -0,0 +1,20 @@
+-- 最终提交（或撤销提交）与 set_selection 使用同一个按投票人的事务级锁：
+-- 提交不会与同一投票人正在进行的草稿替换交错，提交之后到达的草稿替换会被 set_selection 拒绝
+create or replace function submit_selection(p_voter_id text, p_voted boolean default true)
+returns table (updated int)
+language plpgsql
+as $$
+declare
+    v_updated int;
+begin
+    perform pg_advisory_xact_lock(hashtext('set_selection:' || p_voter_id));
+
+    -- updated_at 由 votes_touch_updated_at 触发器维护
+    update votes v
+    set voted = p_voted
+    where v.voter_id = p_voter_id;
+    get diagnostics v_updated = row_count;
+
+    return query select v_updated;
+end;
+$$;
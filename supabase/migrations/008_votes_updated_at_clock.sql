@@ -0,0 +1,12 @@
+-- now() 是事务开始的时间：排队等待 set_selection 锁的事务可能在一次增量刷新之后才提交，
+-- 其 updated_at 却早于该次刷新读到的水位线。改用写入这一行时的 clock_timestamp()，
+-- 缩小 updated_at 与提交时间的差距；共享缓存的增量拉取另外回看 VOTES_WATERMARK_LAG 秒，覆盖剩余的差距
+create or replace function votes_touch_updated_at()
+returns trigger
+language plpgsql
+as $$
+begin
+    new.updated_at := clock_timestamp();
+    return new;
+end;
+$$;
@@ -0,0 +1,45 @@
+-- 每位投票人最多可选的口号数只保存在这一行：set_selection 按它校验，应用读取它显示和限制勾选，
+-- 修改上限只需更新这一行（update vote_settings set max_votes = ...），新的会话即按新上限运行
+create table if not exists vote_settings (
+    id int primary key default 1 check (id = 1),
+    max_votes int not null check (max_votes > 0)
+);
+
+insert into vote_settings (id, max_votes) values (1, 20)
+on conflict (id) do nothing;
+
+create or replace function set_selection(p_voter_id text, p_slogan_ids int[])
+returns table (added int, removed int)
+language plpgsql
+as $$
+declare
+    v_max_votes int := (select s.max_votes from vote_settings s where s.id = 1);
+    v_slogan_ids int[] := array(select distinct s from unnest(coalesce(p_slogan_ids, '{}')) s);
+    v_added int;
+    v_removed int;
+begin
+    if cardinality(v_slogan_ids) > v_max_votes then
+        raise exception '最多只能选择 % 条口号', v_max_votes using errcode = 'check_violation';
+    end if;
+
+    -- 事务级锁，提交或回滚时释放；同一投票人的下一次调用看到的是本次替换后的选择
+    perform pg_advisory_xact_lock(hashtext('set_selection:' || p_voter_id));
+
+    if exists (select 1 from votes v where v.voter_id = p_voter_id and v.voted) then
+        raise exception '投票已提交，不能再修改选择' using errcode = 'check_violation';
+    end if;
+
+    delete from votes v
+    where v.voter_id = p_voter_id
+      and v.slogan_id <> all (v_slogan_ids);
+    get diagnostics v_removed = row_count;
+
+    insert into votes (voter_id, slogan_id, voted, created_at, updated_at)
+    select p_voter_id, s, false, now(), now()
+    from unnest(v_slogan_ids) s
+    on conflict (voter_id, slogan_id) do nothing;
+    get diagnostics v_added = row_count;
+
+    return query select v_added, v_removed;
+end;
+$$;
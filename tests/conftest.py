@@ -0,0 +1,11 @@
+"""在无 Streamlit 运行时的情况下导入 vote2supabase，默认使用内存替身，不访问网络"""
+import os
+import sys
+
+from streamlit import logger
+
+os.environ.setdefault("SUPABASE_BACKEND", "memory")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 裸模式下 Streamlit 会对每次 session_state 访问打印警告
+logger.set_log_level("error")
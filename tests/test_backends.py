@@ -0,0 +1,310 @@
+import random
+import threading
+
+import pytest
+from postgrest.exceptions import APIError as PostgrestAPIError
+
+import vote2supabase as app
+from memory_supabase import APIError, MemorySupabase
+from sqlite_supabase import SqliteSupabase
+
+
+@pytest.fixture
+def sqlite_backend(tmp_path):
+    backend = SqliteSupabase(str(tmp_path / "votes.sqlite3"))
+    yield backend
+    backend.close()
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(request):
+    if request.param == "memory":
+        return MemorySupabase()
+    return request.getfixturevalue("sqlite_backend")
+
+
+def without_generated(rows):
+    """去掉各后端各自生成的 id 和时间戳后排序，便于比较"""
+    return sorted(
+        tuple(sorted((key, value) for key, value in row.items() if key not in ('id', 'created_at', 'updated_at')))
+        for row in rows
+    )
+
+
+def change_events(events):
+    result = []
+    for event in events:
+        change = event['data']
+        row = change['record'] or change['old_record']
+        result.append((change['type'], row.get('voter_id'), row.get('slogan_id'),
+                       change['record'].get('voted'), change['old_record'].get('voted')))
+    return result
+
+
+def stored_selection(backend, voter_id):
+    return sorted(row['slogan_id'] for row in
+                  backend.table('votes').select('slogan_id').eq('voter_id', voter_id).execute().data)
+
+
+def draw_write(rng, n_voters=15, n_slogans=30):
+    """随机抽取一次对 votes 表的写入（逐行 upsert / delete / update 或 set_selection / submit_selection），
+    返回在给定后端上执行它的函数，便于在多个后端上重复同一次写入"""
+    voter_id, slogan_id, op = f"评委{rng.randrange(n_voters)}", rng.randrange(1, n_slogans), rng.random()
+    selection, submitted = rng.sample(range(1, n_slogans), rng.randint(0, 5)), rng.random() < 0.5
+
+    def write(backend):
+        votes = backend.table('votes')
+        if op < 0.4:
+            votes.upsert([{'voter_id': voter_id, 'slogan_id': slogan_id, 'voted': False}],
+                         on_conflict='voter_id,slogan_id').execute()
+        elif op < 0.55:
+            votes.delete().eq('voter_id', voter_id).in_('slogan_id', [slogan_id, slogan_id + 1]).execute()
+        elif op < 0.7:
+            votes.update({'voted': True}).eq('voter_id', voter_id).execute()
+        elif op < 0.8:
+            votes.upsert({'voter_id': voter_id, 'slogan_id': slogan_id, 'voted': True},
+                         on_conflict='voter_id,slogan_id').execute()
+        elif op < 0.9:
+            try:
+                backend.rpc('set_selection', {'p_voter_id': voter_id, 'p_slogan_ids': selection}).execute()
+            except APIError as e:
+                assert e.code == '23514'
+        else:
+            backend.rpc('submit_selection', {'p_voter_id': voter_id, 'p_voted': submitted}).execute()
+
+    return write
+
+
+def test_sqlite_matches_memory_on_random_writes(sqlite_backend):
+    memory = MemorySupabase()
+    backends = (memory, sqlite_backend)
+    events = {memory: [], sqlite_backend: []}
+    for backend in backends:
+        backend.table('slogans').insert([
+            {'serial_number': i, 'slogan_text': f"南岳衡山口号{i}"} for i in range(1, 31)
+        ]).execute()
+        backend.subscribe('votes', events[backend].append)
+
+    rng = random.Random(1)
+    for _ in range(400):
+        write = draw_write(rng)
+        for backend in backends:
+            write(backend)
+
+    assert memory.rpc('vote_tally', {'p_limit': 5}).execute().data \
+        == sqlite_backend.rpc('vote_tally', {'p_limit': 5}).execute().data
+    assert memory.rpc('vote_summary').execute().data == sqlite_backend.rpc('vote_summary').execute().data
+
+    queries = [
+        lambda backend: backend.table('votes').select('*'),
+        lambda backend: backend.table('votes').select('voter_id, voted').gt('slogan_id', 10).eq('voted', True),
+        lambda backend: backend.table('votes').select('*', count='exact')
+        .order('slogan_id', desc=True).order('voter_id').range(3, 20),
+    ]
+    for query in queries:
+        expected, actual = query(memory).execute(), query(sqlite_backend).execute()
+        assert without_generated(actual.data) == without_generated(expected.data)
+        assert actual.count == expected.count
+    assert change_events(events[sqlite_backend]) == change_events(events[memory])
+
+
+def test_live_tally_matches_vote_tally_rpc(backend, monkeypatch):
+    """由推送增量维护的 LiveTally 与数据库函数 vote_tally / vote_summary 的结果一致"""
+    rng = random.Random(2)
+    for _ in range(50):
+        draw_write(rng)(backend)
+    monkeypatch.setitem(app.st.session_state, 'supabase', backend)
+    cache = app.SharedVoteCache()
+    cache.refresh(force=True)
+    backend.subscribe('votes', cache.apply_change)
+
+    for step in range(300):
+        draw_write(rng)(backend)
+        if step % 50 == 49:
+            assert app.fetch_vote_tally(app.LocalTallySource(cache.live_tally)) == app.fetch_vote_tally(backend)
+            assert app.fetch_vote_tally(app.LocalTallySource(cache.live_tally), 3) == app.fetch_vote_tally(backend, 3)
+
+
+def test_set_selection_replaces_draft(backend):
+    assert backend.rpc('set_selection', {'p_voter_id': 'A', 'p_slogan_ids': [1, 2, 3]}).execute().data \
+        == [{'added': 3, 'removed': 0}]
+    assert backend.rpc('set_selection', {'p_voter_id': 'A', 'p_slogan_ids': [2, 3, 4, 4]}).execute().data \
+        == [{'added': 1, 'removed': 1}]
+    assert stored_selection(backend, 'A') == [2, 3, 4]
+
+    max_votes = app.load_max_votes(backend)
+    with pytest.raises(APIError) as error:
+        backend.rpc('set_selection', {'p_voter_id': 'A', 'p_slogan_ids': list(range(max_votes + 1))}).execute()
+    assert error.value.code == '23514'
+    assert stored_selection(backend, 'A') == [2, 3, 4]
+
+
+def test_submit_selection_locks_the_draft(backend):
+    backend.rpc('set_selection', {'p_voter_id': 'A', 'p_slogan_ids': [1, 2]}).execute()
+    assert backend.rpc('submit_selection', {'p_voter_id': 'A', 'p_voted': True}).execute().data \
+        == [{'updated': 2}]
+    assert all(row['voted'] for row in backend.table('votes').select('voted').eq('voter_id', 'A').execute().data)
+
+    with pytest.raises(APIError) as error:
+        backend.rpc('set_selection', {'p_voter_id': 'A', 'p_slogan_ids': [3]}).execute()
+    assert error.value.code == '23514'
+    assert stored_selection(backend, 'A') == [1, 2]
+
+
+def test_vote_limit_is_read_from_vote_settings(backend):
+    """应用和 set_selection 读取同一行选择上限，修改这一行两边同时生效"""
+    backend.table('vote_settings').update({'max_votes': 3}).eq('id', 1).execute()
+    assert app.load_max_votes(backend) == 3
+
+    with pytest.raises(APIError) as error:
+        backend.rpc('set_selection', {'p_voter_id': 'A', 'p_slogan_ids': [1, 2, 3, 4]}).execute()
+    assert error.value.code == '23514'
+    assert backend.rpc('set_selection', {'p_voter_id': 'A', 'p_slogan_ids': [1, 2, 3]}).execute().data \
+        == [{'added': 3, 'removed': 0}]
+
+
+def test_concurrent_set_selection_keeps_one_whole_selection(backend):
+    """多个标签页同时整体替换同一投票人的选择：最终结果是其中某一次完整的选择，不会混合或超过上限"""
+    written = []
+    lock = threading.Lock()
+    max_votes = app.load_max_votes(backend)
+
+    def tab(seed):
+        rng = random.Random(seed)
+        for _ in range(50):
+            selection = sorted(rng.sample(range(1, 100), rng.randint(1, max_votes)))
+            app.sync_voter_selection(backend, 'B', selection)
+            with lock:
+                written.append(selection)
+
+    threads = [threading.Thread(target=tab, args=(seed,)) for seed in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    final = stored_selection(backend, 'B')
+    assert len(final) <= max_votes
+    assert final in written
+
+
+class Unavailable(Exception):
+    code = '503'
+
+
+def unavailable():
+    raise Unavailable()
+
+
+def open_breaker(breaker):
+    for _ in range(breaker.failure_threshold):
+        breaker.before_call()
+        breaker.record_failure()
+
+
+def test_circuit_breaker_opens_after_threshold_and_fails_fast():
+    breaker = app.CircuitBreaker(failure_threshold=3, reset_timeout=60)
+    for _ in range(2):
+        breaker.before_call()
+        breaker.record_failure()
+    assert breaker.state == 'closed'
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == 'open'
+
+    calls = []
+    with pytest.raises(app.CircuitOpenError):
+        app.call_with_retry(lambda: calls.append(1), breaker)
+    assert calls == []
+
+
+def test_circuit_breaker_half_open_probe(monkeypatch):
+    monkeypatch.setattr(app, 'backoff_delay', lambda attempt: 0)
+    breaker = app.CircuitBreaker(failure_threshold=3, reset_timeout=60)
+    open_breaker(breaker)
+
+    # 熔断期满后只放行一个探测请求，探测失败重新熔断
+    breaker.opened_at -= breaker.reset_timeout
+    breaker.before_call()
+    assert breaker.state == 'half_open'
+    with pytest.raises(app.CircuitOpenError):
+        breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == 'open'
+
+    # 探测成功恢复 closed，计数清零
+    breaker.opened_at -= breaker.reset_timeout
+    assert app.call_with_retry(lambda: 'ok', breaker) == 'ok'
+    assert breaker.state == 'closed'
+    assert breaker.failures == 0
+
+
+def test_call_with_retry_counts_only_transient_errors(monkeypatch):
+    monkeypatch.setattr(app, 'backoff_delay', lambda attempt: 0)
+    breaker = app.CircuitBreaker(failure_threshold=3, reset_timeout=60)
+
+    def conflict():
+        raise APIError('投票数量超过上限', '23514')
+
+    for _ in range(5):
+        with pytest.raises(APIError):
+            app.call_with_retry(conflict, breaker)
+    assert breaker.state == 'closed'
+
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            unavailable()
+        return 'ok'
+
+    assert app.call_with_retry(flaky, breaker) == 'ok'
+    assert len(attempts) == 3
+    assert breaker.state == 'closed'
+
+    with pytest.raises(Unavailable):
+        app.call_with_retry(unavailable, breaker)
+    assert breaker.state == 'open'
+
+
+def test_postgrest_connection_errors_are_retried_and_open_the_breaker(monkeypatch):
+    """数据库不可达时 PostgREST 返回 PGRST001 等错误码而不是 HTTP 状态码，同样应重试并计入熔断"""
+    monkeypatch.setattr(app, 'backoff_delay', lambda attempt: 0)
+    breaker = app.CircuitBreaker(failure_threshold=3, reset_timeout=60)
+    attempts = []
+
+    def unreachable():
+        attempts.append(1)
+        raise PostgrestAPIError({'code': 'PGRST001', 'message': 'Database client error. Retrying the connection.'})
+
+    with pytest.raises(PostgrestAPIError):
+        app.call_with_retry(unreachable, breaker, attempts=3)
+    assert len(attempts) == 3
+    assert breaker.state == 'open'
+
+
+def test_non_transient_error_leaves_breaker_alone(monkeypatch):
+    monkeypatch.setattr(app, 'backoff_delay', lambda attempt: 0)
+    breaker = app.CircuitBreaker(failure_threshold=3, reset_timeout=60)
+
+    def conflict():
+        raise APIError('投票数量超过上限', '23514')
+
+    for _ in range(2):
+        with pytest.raises(Unavailable):
+            app.call_with_retry(unavailable, breaker, attempts=1)
+    with pytest.raises(APIError):
+        app.call_with_retry(conflict, breaker)
+    assert breaker.failures == 2
+    with pytest.raises(Unavailable):
+        app.call_with_retry(unavailable, breaker, attempts=1)
+    assert breaker.state == 'open'
+
+    # 半开探测以非暂时性错误结束：保持半开并让出探测名额，下一次探测成功才恢复
+    breaker.opened_at -= breaker.reset_timeout
+    with pytest.raises(APIError):
+        app.call_with_retry(conflict, breaker)
+    assert breaker.state == 'half_open'
+    assert app.call_with_retry(lambda: 'ok', breaker) == 'ok'
+    assert breaker.state == 'closed'
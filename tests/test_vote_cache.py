@@ -0,0 +1,49 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import vote2supabase as app
+from memory_supabase import MemorySupabase
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    backend = MemorySupabase()
+    monkeypatch.setitem(app.st.session_state, 'supabase', backend)
+    return backend
+
+
+def commit_late(backend, voter_id, slogan_id, seconds):
+    """模拟较早开始、较晚提交的事务：插入的记录 updated_at 比当前时间早 seconds 秒"""
+    backend.table('votes').insert({'voter_id': voter_id, 'slogan_id': slogan_id, 'voted': True}).execute()
+    stamp = (datetime.now(timezone.utc) - timedelta(seconds=seconds)).isoformat()
+    for row in backend.tables['votes']:
+        if row['voter_id'] == voter_id and row['slogan_id'] == slogan_id:
+            row['updated_at'] = stamp
+
+
+def test_delta_refresh_picks_up_rows_committed_behind_the_watermark(backend):
+    backend.table('votes').insert({'voter_id': '评委0', 'slogan_id': 1, 'voted': True}).execute()
+    cache = app.SharedVoteCache()
+    cache.refresh(force=True)
+
+    commit_late(backend, '评委1', 2, seconds=10)
+    backend.table('votes').insert({'voter_id': '评委2', 'slogan_id': 3, 'voted': True}).execute()
+    cache.refresh(force=True)
+    assert cache.votes_data.keys() == {'评委0', '评委1', '评委2'}
+    assert cache.live_tally.tally() == [(1, 1), (2, 1), (3, 1)]
+
+
+def test_overlap_window_does_not_republish_unchanged_rows(backend):
+    backend.table('votes').insert([{'voter_id': '评委0', 'slogan_id': i, 'voted': True} for i in (1, 2)]).execute()
+    cache = app.SharedVoteCache()
+    cache.refresh(force=True)
+    version, revision = cache.version, cache.revision
+
+    cache.refresh(force=True)
+    assert (cache.version, cache.revision) == (version, revision)
+
+    backend.table('votes').update({'voted': False}).eq('slogan_id', 2).execute()
+    cache.refresh(force=True)
+    assert cache.version == version + 1
+    assert cache.live_tally.tally() == [(1, 1)]
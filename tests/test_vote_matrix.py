@@ -0,0 +1,36 @@
+import numpy as np
+
+import vote2supabase as app
+
+
+def make_matrix(ballots, submitted=True):
+    return app.VoteMatrix.from_votes_data({
+        f"评委{i}": {"votes": votes, "voted": submitted} for i, votes in enumerate(ballots)
+    })
+
+
+def test_rank_stability_orders_like_tally():
+    rng = np.random.default_rng(0)
+    ballots = [rng.choice(np.arange(1, 41), size=5, replace=False).tolist() for _ in range(60)]
+    matrix = make_matrix(ballots)
+    result = matrix.rank_stability(n_boot=200, seed=0)
+
+    assert result['slogan_id'].tolist() == [slogan_id for slogan_id, _ in matrix.tally()]
+    assert (result['rank_low'] <= result['rank_high']).all()
+    assert np.isclose(result['p_top_k'].sum(), app.RANK_STABILITY_TOP_K)
+
+
+def test_rank_stability_breaks_ties_symmetrically():
+    # 口号 1 和 2 被同一批评委选中，在每次重抽样中都同票
+    ballots = [[1, 2, 3]] * 10 + [[4]] * 10 + [[5]] * 5
+    result = make_matrix(ballots).rank_stability(top_k=1, n_boot=500, seed=0).set_index('slogan_id')
+
+    assert result.loc[1, 'p_top_k'] == result.loc[2, 'p_top_k']
+    assert result.loc[1, 'p_top_k'] == result.loc[3, 'p_top_k']
+    assert np.isclose(result['p_top_k'].sum(), 1)
+    # 同票的口号不会固定排在某一名
+    assert (result.loc[[1, 2, 3], 'rank_high'] > result.loc[[1, 2, 3], 'rank_low']).all()
+
+
+def test_rank_stability_without_submitted_votes():
+    assert make_matrix([[1, 2]], submitted=False).rank_stability(n_boot=10).empty
@@ -0,0 +1,56 @@
+import pytest
+
+import vote2supabase as app
+from memory_supabase import MemorySupabase
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    backend = MemorySupabase()
+    queue = app.WriteBehindQueue(debounce=60, max_delay=60)
+    cache = app.SharedVoteCache()
+    monkeypatch.setattr(app, 'get_write_queue', lambda: queue)
+    monkeypatch.setattr(app, 'get_vote_cache', lambda: cache)
+    for key, value in (('supabase', backend), ('voter_record', None), ('voted', False)):
+        monkeypatch.setitem(app.st.session_state, key, value)
+    return backend
+
+
+def stored_votes(backend, voter_id):
+    rows = backend.table('votes').select('slogan_id, voted').eq('voter_id', voter_id).execute().data
+    return sorted(row['slogan_id'] for row in rows), any(row['voted'] for row in rows)
+
+
+def test_submit_refuses_selection_rejected_in_background(backend):
+    """后台保存被拒绝（已在其他页面提交）后，提交不能把界面上的选择当作已保存"""
+    backend.rpc('set_selection', {'p_voter_id': '评委0', 'p_slogan_ids': [1, 2]}).execute()
+    backend.rpc('submit_selection', {'p_voter_id': '评委0', 'p_voted': True}).execute()
+
+    queue = app.get_write_queue()
+    queue.submit(backend, '评委0', [1, 2, 3])
+    assert not queue.flush('评委0')
+    assert queue.status('评委0')['state'] == 'rejected'
+    # 被拒绝的更改不在队列中，再次 flush 也会返回 True
+    assert queue.flush('评委0')
+
+    outcome, error = app.submit_vote('评委0')
+    assert outcome == 'reloaded'
+    assert error
+    assert sorted(app.st.session_state.voter_record['votes']) == [1, 2]
+    assert app.st.session_state.voted
+    assert app.get_voter_selection('评委0') == app.st.session_state.voter_record['votes']
+    assert stored_votes(backend, '评委0') == ([1, 2], True)
+
+
+def test_submit_after_rejection_uses_the_saved_selection(backend):
+    backend.rpc('set_selection', {'p_voter_id': '评委0', 'p_slogan_ids': [1, 2]}).execute()
+
+    queue = app.get_write_queue()
+    queue.submit(backend, '评委0', range(1, app.load_max_votes(backend) + 2))
+    assert app.submit_vote('评委0')[0] == 'reloaded'
+    assert stored_votes(backend, '评委0') == ([1, 2], False)
+    assert sorted(app.st.session_state.voter_record['votes']) == [1, 2]
+
+    # 拒绝只影响一次提交，确认恢复后的选择后可以正常提交
+    assert app.submit_vote('评委0') == ('submitted', None)
+    assert stored_votes(backend, '评委0') == ([1, 2], True)